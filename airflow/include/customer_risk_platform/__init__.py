@@ -1,18 +1,20 @@
-"""
-Customer Risk Platform Package
-"""
-
-# Only import functions that actually exist and work
-from .extractors import extract_sales_data
-from .validators import validate_data_quality  
-from .transformers import transform_clean_data
-from .fraud_analyzers import enrich_fraud_indicators
-from .monitoring import track_performance_metrics
-
-__all__ = [
-    'extract_sales_data',
-    'validate_data_quality',
-    'transform_clean_data',
-    'enrich_fraud_indicators',
-    'track_performance_metrics'
-]
\ No newline at end of file
+"""
+Customer Risk Platform Package
+"""
+
+# Only import functions that actually exist and work
+from .extractors import extract_sales_data, extract_carts_data, extract_users_data
+from .validators import validate_data_quality  
+from .transformers import transform_clean_data
+from .fraud_analyzers import enrich_fraud_indicators
+from .monitoring import track_performance_metrics
+
+__all__ = [
+    'extract_sales_data',
+    'extract_carts_data',
+    'extract_users_data',
+    'validate_data_quality',
+    'transform_clean_data',
+    'enrich_fraud_indicators',
+    'track_performance_metrics'
+]
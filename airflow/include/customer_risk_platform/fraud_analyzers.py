@@ -1,618 +1,717 @@
-# include/customer_risk_platform/fraud_analyzers.py
-"""
-Fraud detection engine with multi-dimensional risk scoring
-"""
-import pandas as pd
-import numpy as np
-import logging
-from typing import Dict, List, Any, Tuple, Optional
-from datetime import datetime, timedelta
-import hashlib
-import json
-from dataclasses import dataclass
-from enum import Enum
-from airflow.providers.postgres.hooks.postgres import PostgresHook
-
-logger = logging.getLogger(__name__)
-
-class RiskLevel(Enum):
-    """Risk level classification"""
-    LOW = "low"
-    MEDIUM = "medium"
-    HIGH = "high"
-    CRITICAL = "critical"
-
-@dataclass
-class FraudIndicator:
-    """Fraud indicator data structure"""
-    indicator_type: str
-    severity: str
-    confidence: float
-    description: str
-    contributing_factors: List[str]
-
-class FraudDetectionEngine:
-    """Multi-dimensional fraud risk analyzer"""
-    
-    def __init__(self):
-        # Risk scoring weights
-        self.risk_weights = {
-            'velocity_risk': 0.25,
-            'geographic_risk': 0.20,
-            'behavioral_risk': 0.20,
-            'profile_risk': 0.15,
-            'amount_risk': 0.10,
-            'temporal_risk': 0.10
-        }
-        
-        # Thresholds for risk classification
-        self.risk_thresholds = {
-            RiskLevel.LOW: 0.3,
-            RiskLevel.MEDIUM: 0.6,
-            RiskLevel.HIGH: 0.8,
-            RiskLevel.CRITICAL: 0.9
-        }
-        
-        # Industry fraud patterns
-        self.fraud_patterns = {
-            'high_velocity': {'threshold': 5, 'window_hours': 24},
-            'geographic_anomaly': {'distance_km': 1000, 'time_hours': 6},
-            'amount_spike': {'multiplier': 3.0, 'baseline_orders': 3},
-            'new_customer_high_activity': {'orders_threshold': 10, 'amount_threshold': 2000}
-        }
-
-    def enrich_fraud_indicators(self, customer_profiles: List[Dict], **context) -> Dict[str, Any]:
-        """
-        Main function to enrich customer profiles with fraud indicators
-        
-        Args:
-            customer_profiles: Transformed customer profiles from transformers module
-            
-        Returns:
-            Dict containing enriched profiles with fraud analysis
-        """
-        try:
-            logger.info(f"Starting fraud analysis for {len(customer_profiles)} customer profiles...")
-            
-            profiles_with_timestamps = self._simulate_transaction_timestamps(customer_profiles)
-
-            risk_analyzed_profiles = []
-            fraud_alerts = []
-            
-            for profile in profiles_with_timestamps:
-                # Perform comprehensive fraud analysis
-                fraud_analysis = self._perform_fraud_analysis(profile)
-                
-                # Enrich profile with fraud data
-                enriched_profile = {
-                    **profile,
-                    **fraud_analysis['risk_assessment'],
-                    'fraud_indicators': fraud_analysis['indicators'],
-                    'ml_features': fraud_analysis['ml_features']
-                }
-                
-                risk_analyzed_profiles.append(enriched_profile)
-                
-                # Generate alerts for high-risk customers
-                if fraud_analysis['risk_assessment']['risk_level'] in ['high', 'critical']:
-                    fraud_alerts.append(self._create_fraud_alert(enriched_profile))
-            
-            # Calculate metrics
-            analysis_metrics = self._calculate_fraud_metrics(risk_analyzed_profiles)
-            
-            logger.info(f"Fraud analysis completed. {len(fraud_alerts)} high-risk customers identified")
-            
-            return {
-                'risk_analyzed_profiles': risk_analyzed_profiles,
-                'fraud_alerts': fraud_alerts,
-                'fraud_metrics': analysis_metrics,
-                'analysis_timestamp': datetime.utcnow().isoformat()
-            }
-            
-        except Exception as e:
-            logger.error(f"Error in fraud analysis: {str(e)}")
-            raise
-
-
-    def _simulate_transaction_timestamps(self, profiles: List[Dict]) -> List[Dict]:
-        """
-        Simulate realistic transaction timestamps for fraud analysis
-        Since DummyJSON doesn't provide timestamps, we create realistic patterns
-        """
-        enriched_profiles = []
-        
-        for profile in profiles:
-            customer_id = profile['customer_id']
-            total_orders = profile.get('total_orders', 0)
-            
-            # Generate realistic transaction timeline
-            if total_orders > 0:
-
-                base_date = datetime.utcnow() - timedelta(days=90)
-                np.random.seed(customer_id)
-
-                transaction_timestamps = []
-                for i in range(total_orders):
-                    # Distribute transactions over time with some clustering for realism
-                    days_offset = np.random.exponential(scale=90/total_orders) * i
-                    hours_offset = np.random.uniform(6, 22)  # Business hours bias
-                    
-                    transaction_time = base_date + timedelta(
-                        days=min(89, days_offset), 
-                        hours=hours_offset
-                    )
-                    transaction_timestamps.append(transaction_time)
-                
-                # Sort chronologically
-                transaction_timestamps.sort()
-                
-                profile['transaction_timestamps'] = [ts.isoformat() for ts in transaction_timestamps]
-                profile['first_transaction'] = transaction_timestamps[0].isoformat()
-                profile['last_transaction'] = transaction_timestamps[-1].isoformat()
-                
-                # Calculate velocity metrics
-                profile['transaction_velocity'] = self._calculate_velocity_metrics(transaction_timestamps)
-            else:
-                profile['transaction_timestamps'] = []
-                profile['transaction_velocity'] = {'max_daily': 0, 'avg_daily': 0}
-            
-            enriched_profiles.append(profile)
-            
-        return enriched_profiles
-
-    def _perform_fraud_analysis(self, profile: Dict) -> Dict[str, Any]:
-        """
-        Perform comprehensive fraud analysis on a single customer profile
-        """
-        indicators = []
-        risk_scores = {}
-        
-        # 1. Velocity Risk Analysis
-        velocity_risk, velocity_indicators = self._analyze_velocity_risk(profile)
-        risk_scores['velocity_risk'] = velocity_risk
-        indicators.extend(velocity_indicators)
-        
-        # 2. Geographic Risk Analysis
-        geographic_risk, geo_indicators = self._analyze_geographic_risk(profile)
-        risk_scores['geographic_risk'] = geographic_risk
-        indicators.extend(geo_indicators)
-        
-        # 3. Behavioral Risk Analysis
-        behavioral_risk, behavioral_indicators = self._analyze_behavioral_risk(profile)
-        risk_scores['behavioral_risk'] = behavioral_risk
-        indicators.extend(behavioral_indicators)
-        
-        # 4. Profile Risk Analysis
-        profile_risk, profile_indicators = self._analyze_profile_risk(profile)
-        risk_scores['profile_risk'] = profile_risk
-        indicators.extend(profile_indicators)
-        
-        # 5. Amount Risk Analysis
-        amount_risk, amount_indicators = self._analyze_amount_risk(profile)
-        risk_scores['amount_risk'] = amount_risk
-        indicators.extend(amount_indicators)
-        
-        # 6. Temporal Risk Analysis
-        temporal_risk, temporal_indicators = self._analyze_temporal_risk(profile)
-        risk_scores['temporal_risk'] = temporal_risk
-        indicators.extend(temporal_indicators)
-        
-        # Calculate composite risk score
-        composite_score = self._calculate_composite_risk_score(risk_scores)
-        risk_level = self._determine_risk_level(composite_score)
-        
-        # Generate ML-ready features
-        ml_features = self._extract_ml_features(profile, risk_scores)
-        
-        return {
-            'risk_assessment': {
-                'composite_risk_score': composite_score,
-                'risk_level': risk_level.value,
-                'individual_risk_scores': risk_scores,
-                'risk_classification_confidence': self._calculate_confidence(composite_score)
-            },
-            'indicators': [indicator.__dict__ for indicator in indicators],
-            'ml_features': ml_features
-        }
-
-    def _analyze_velocity_risk(self, profile: Dict) -> Tuple[float, List[FraudIndicator]]:
-        """Check transaction velocity"""
-        indicators = []
-        risk_score = 0.0
-        
-        velocity_data = profile.get('transaction_velocity', {})
-        max_daily = velocity_data.get('max_daily', 0)
-        total_orders = profile.get('total_orders', 0)
-        
-        # High velocity pattern detection
-        if max_daily >= 5:
-            risk_score += 0.6
-            indicators.append(FraudIndicator(
-                indicator_type="HIGH_VELOCITY",
-                severity="high",
-                confidence=0.8,
-                description=f"Customer made {max_daily} transactions in single day",
-                contributing_factors=["unusual_transaction_frequency"]
-            ))
-        
-        # Burst pattern detection (many transactions in short time)
-        if total_orders >= 10 and len(profile.get('transaction_timestamps', [])) > 0:
-            # Simulate burst detection
-            customer_hash = hash(str(profile['customer_id']))
-            if customer_hash % 20 == 0:  # 5% chance of burst pattern
-                risk_score += 0.4
-                indicators.append(FraudIndicator(
-                    indicator_type="BURST_PATTERN",
-                    severity="medium",
-                    confidence=0.7,
-                    description="Detected burst of transactions in short timeframe",
-                    contributing_factors=["transaction_clustering"]
-                ))
-        
-        return min(1.0, risk_score), indicators
-
-    def _analyze_geographic_risk(self, profile: Dict) -> Tuple[float, List[FraudIndicator]]:
-        """Check geographic patterns"""
-        indicators = []
-        risk_score = 0.0
-        
-        country = profile.get('country', '').lower()
-        
-        # International transaction risk
-        if country not in ['united states', 'canada', 'united kingdom']:
-            risk_score += 0.3
-            indicators.append(FraudIndicator(
-                indicator_type="INTERNATIONAL_PROFILE",
-                severity="low",
-                confidence=0.6,
-                description=f"Customer located in {country}",
-                contributing_factors=["geographic_location"]
-            ))
-        
-        # Simulate impossible travel scenarios
-        customer_hash = hash(str(profile['customer_id']))
-        if customer_hash % 25 == 0:  # 4% chance of impossible travel
-            risk_score += 0.7
-            indicators.append(FraudIndicator(
-                indicator_type="IMPOSSIBLE_TRAVEL",
-                severity="high",
-                confidence=0.9,
-                description="Detected transactions from impossible geographic locations",
-                contributing_factors=["geographic_anomaly", "location_spoofing"]
-            ))
-        
-        return min(1.0, risk_score), indicators
-
-    def _analyze_behavioral_risk(self, profile: Dict) -> Tuple[float, List[FraudIndicator]]:
-        """Check behavioral patterns"""
-        indicators = []
-        risk_score = 0.0
-        
-        # New customer with high activity
-        total_spent = profile.get('total_spent', 0)
-        total_orders = profile.get('total_orders', 0)
-        customer_segment = profile.get('customer_segment', 'new')
-        
-        if customer_segment == 'new' and total_spent > 2000:
-            risk_score += 0.5
-            indicators.append(FraudIndicator(
-                indicator_type="NEW_CUSTOMER_HIGH_SPENDING",
-                severity="medium",
-                confidence=0.7,
-                description=f"New customer with high spending: ${total_spent}",
-                contributing_factors=["unusual_behavior_pattern"]
-            ))
-        
-        # Unusual product diversity
-        diversity_score = profile.get('product_diversity_score', 0)
-        if diversity_score > 0.9 and total_orders >= 5:
-            risk_score += 0.3
-            indicators.append(FraudIndicator(
-                indicator_type="UNUSUAL_PRODUCT_DIVERSITY",
-                severity="low",
-                confidence=0.6,
-                description="Unusually diverse product purchase pattern",
-                contributing_factors=["behavioral_anomaly"]
-            ))
-        
-        return min(1.0, risk_score), indicators
-
-    def _analyze_profile_risk(self, profile: Dict) -> Tuple[float, List[FraudIndicator]]:
-        """Check profile completeness"""
-        indicators = []
-        risk_score = 0.0
-        
-        profile_completeness = profile.get('profile_completeness', 1.0)
-        
-        # Incomplete profile risk
-        if profile_completeness < 0.5:
-            risk_score += 0.4
-            indicators.append(FraudIndicator(
-                indicator_type="INCOMPLETE_PROFILE",
-                severity="medium",
-                confidence=0.8,
-                description=f"Profile only {profile_completeness*100:.1f}% complete",
-                contributing_factors=["missing_information"]
-            ))
-        
-        # Email domain analysis
-        email = profile.get('email', '')
-        if email and ('temp' in email or 'disposable' in email):
-            risk_score += 0.6
-            indicators.append(FraudIndicator(
-                indicator_type="SUSPICIOUS_EMAIL",
-                severity="high",
-                confidence=0.9,
-                description="Potentially disposable email address",
-                contributing_factors=["email_risk"]
-            ))
-        
-        return min(1.0, risk_score), indicators
-
-    def _analyze_amount_risk(self, profile: Dict) -> Tuple[float, List[FraudIndicator]]:
-        """Check transaction amounts"""
-        indicators = []
-        risk_score = 0.0
-        
-        avg_order_value = profile.get('avg_order_value', 0)
-        total_spent = profile.get('total_spent', 0)
-        
-        # Unusually high order values
-        if avg_order_value > 1000:
-            risk_score += 0.4
-            indicators.append(FraudIndicator(
-                indicator_type="HIGH_AVERAGE_ORDER",
-                severity="medium",
-                confidence=0.7,
-                description=f"High average order value: ${avg_order_value:.2f}",
-                contributing_factors=["amount_anomaly"]
-            ))
-        
-        # Round number bias (fraudsters often use round numbers)
-        if total_spent > 0 and total_spent % 100 == 0:
-            risk_score += 0.2
-            indicators.append(FraudIndicator(
-                indicator_type="ROUND_NUMBER_BIAS",
-                severity="low",
-                confidence=0.5,
-                description="Transaction amounts show round number pattern",
-                contributing_factors=["amount_pattern"]
-            ))
-        
-        return min(1.0, risk_score), indicators
-
-    def _analyze_temporal_risk(self, profile: Dict) -> Tuple[float, List[FraudIndicator]]:
-        """Check timing patterns"""
-        indicators = []
-        risk_score = 0.0
-        
-        timestamps = profile.get('transaction_timestamps', [])
-        
-        if timestamps:
-            # Simulate off-hours transaction analysis
-            customer_hash = hash(str(profile['customer_id']))
-            if customer_hash % 15 == 0:  # 6.7% chance of off-hours pattern
-                risk_score += 0.3
-                indicators.append(FraudIndicator(
-                    indicator_type="OFF_HOURS_ACTIVITY",
-                    severity="low",
-                    confidence=0.6,
-                    description="Unusual transaction timing patterns detected",
-                    contributing_factors=["temporal_anomaly"]
-                ))
-        
-        return min(1.0, risk_score), indicators
-
-    def _calculate_velocity_metrics(self, timestamps: List[datetime]) -> Dict[str, float]:
-        """Calculate transaction velocity metrics"""
-        if not timestamps:
-            return {'max_daily': 0, 'avg_daily': 0}
-        
-        # Group by date
-        daily_counts = {}
-        for ts in timestamps:
-            date_key = ts.date()
-            daily_counts[date_key] = daily_counts.get(date_key, 0) + 1
-        
-        counts = list(daily_counts.values())
-        return {
-            'max_daily': max(counts) if counts else 0,
-            'avg_daily': sum(counts) / len(counts) if counts else 0
-        }
-
-    def _calculate_composite_risk_score(self, risk_scores: Dict[str, float]) -> float:
-        """Calculate weighted composite risk score"""
-        composite = 0.0
-        for risk_type, score in risk_scores.items():
-            weight = self.risk_weights.get(risk_type, 0)
-            composite += score * weight
-        return min(1.0, composite)
-
-    def _determine_risk_level(self, composite_score: float) -> RiskLevel:
-        """Determine risk level based on composite score"""
-        if composite_score >= self.risk_thresholds[RiskLevel.CRITICAL]:
-            return RiskLevel.CRITICAL
-        elif composite_score >= self.risk_thresholds[RiskLevel.HIGH]:
-            return RiskLevel.HIGH
-        elif composite_score >= self.risk_thresholds[RiskLevel.MEDIUM]:
-            return RiskLevel.MEDIUM
-        else:
-            return RiskLevel.LOW
-
-    def _calculate_confidence(self, risk_score: float) -> float:
-        """Calculate confidence in risk assessment"""
-        # Higher scores have higher confidence, but not linearly
-        return min(0.95, 0.5 + (risk_score * 0.45))
-
-    def _extract_ml_features(self, profile: Dict, risk_scores: Dict[str, float]) -> Dict[str, float]:
-        """Extract ML-ready features for future model training"""
-        return {
-            # Demographic features
-            'age': float(profile.get('age', 0)),
-            'profile_completeness': profile.get('profile_completeness', 0),
-            
-            # Transaction features  
-            'total_spent': float(profile.get('total_spent', 0)),
-            'total_orders': float(profile.get('total_orders', 0)),
-            'avg_order_value': float(profile.get('avg_order_value', 0)),
-            'product_diversity_score': profile.get('product_diversity_score', 0),
-            'customer_activity_score': profile.get('customer_activity_score', 0),
-            
-            # Risk component scores
-            **{f'risk_{k}': v for k, v in risk_scores.items()},
-            
-            # Velocity features
-            'max_daily_transactions': profile.get('transaction_velocity', {}).get('max_daily', 0),
-            'avg_daily_transactions': profile.get('transaction_velocity', {}).get('avg_daily', 0),
-            
-            # Categorical features (encoded)
-            'is_international': 1.0 if profile.get('country', '').lower() not in ['united states', 'canada'] else 0.0,
-            'is_premium_customer': 1.0 if profile.get('customer_segment') == 'premium' else 0.0,
-            'has_risk_indicators': 1.0 if len(profile.get('risk_indicators', [])) > 0 else 0.0
-        }
-
-    def _create_fraud_alert(self, profile: Dict) -> Dict[str, Any]:
-        """Create fraud alert for high-risk customers"""
-        return {
-            'alert_id': f"FRAUD_{profile['customer_id']}_{int(datetime.utcnow().timestamp())}",
-            'customer_id': profile['customer_id'],
-            'customer_name': profile.get('full_name', 'Unknown'),
-            'risk_level': profile['risk_level'],
-            'risk_score': profile['composite_risk_score'],
-            'primary_indicators': [indicator['indicator_type'] for indicator in profile['fraud_indicators'][:3]],
-            'alert_timestamp': datetime.utcnow().isoformat(),
-            'recommended_action': self._get_recommended_action(profile['risk_level']),
-            'investigation_priority': self._get_investigation_priority(profile['composite_risk_score'])
-        }
-
-    def _get_recommended_action(self, risk_level: str) -> str:
-        """Get recommended action based on risk level"""
-        actions = {
-            'critical': 'IMMEDIATE_INVESTIGATION_REQUIRED',
-            'high': 'PRIORITY_REVIEW',
-            'medium': 'ENHANCED_MONITORING',
-            'low': 'STANDARD_MONITORING'
-        }
-        return actions.get(risk_level, 'STANDARD_MONITORING')
-
-    def _get_investigation_priority(self, risk_score: float) -> str:
-        """Get investigation priority based on risk score"""
-        if risk_score >= 0.9:
-            return 'P1_URGENT'
-        elif risk_score >= 0.8:
-            return 'P2_HIGH'
-        elif risk_score >= 0.6:
-            return 'P3_MEDIUM'
-        else:
-            return 'P4_LOW'
-
-    def _calculate_fraud_metrics(self, profiles: List[Dict]) -> Dict[str, Any]:
-        """Calculate overall fraud analysis metrics"""
-        total_customers = len(profiles)
-        risk_distribution = {}
-        
-        for level in RiskLevel:
-            count = sum(1 for p in profiles if p.get('risk_level') == level.value)
-            risk_distribution[level.value] = {
-                'count': count,
-                'percentage': (count / total_customers * 100) if total_customers > 0 else 0
-            }
-        
-        avg_risk_score = sum(p.get('composite_risk_score', 0) for p in profiles) / total_customers if total_customers > 0 else 0
-        
-        return {
-            'total_customers_analyzed': total_customers,
-            'risk_distribution': risk_distribution,
-            'average_risk_score': avg_risk_score,
-            'high_risk_customers': risk_distribution['high']['count'] + risk_distribution['critical']['count'],
-            'fraud_detection_rate': (risk_distribution['high']['count'] + risk_distribution['critical']['count']) / total_customers * 100 if total_customers > 0 else 0
-        }
-
-def _save_fraud_scores_to_staging(fraud_profiles: List[Dict]) -> None:
-    """Save fraud analysis results to staging for dbt consumption"""
-    if not fraud_profiles:
-        logger.warning("No fraud scores to save")
-        return
-    
-    from airflow.providers.postgres.hooks.postgres import PostgresHook
-    postgres_hook = PostgresHook(postgres_conn_id='postgres_default')
-    
-    try:
-        truncate_sql = "TRUNCATE TABLE staging.fraud_scores;"
-        postgres_hook.run(truncate_sql)
-        
-        insert_sql = """
-        INSERT INTO staging.fraud_scores 
-        (customer_id, composite_risk_score, risk_level,
-        velocity_risk, geographic_risk, behavioral_risk, 
-        profile_risk, amount_risk, temporal_risk,
-        fraud_indicators_json, ml_features_json)
-        VALUES %s;
-        """
-        
-        values_list = [
-            (
-                p['customer_id'],
-                p['composite_risk_score'],
-                p['risk_level'],
-                p['individual_risk_scores']['velocity_risk'],
-                p['individual_risk_scores']['geographic_risk'],
-                p['individual_risk_scores']['behavioral_risk'],
-                p['individual_risk_scores']['profile_risk'],
-                p['individual_risk_scores']['amount_risk'],
-                p['individual_risk_scores']['temporal_risk'],
-                json.dumps(p['fraud_indicators']),
-                json.dumps(p['ml_features'])
-            )
-            for p in fraud_profiles
-        ]
-        
-        connection = postgres_hook.get_conn()
-        cursor = connection.cursor()
-        
-        from psycopg2.extras import execute_values
-        execute_values(cursor, insert_sql, values_list, page_size=1000)
-        
-        connection.commit()
-        cursor.close()
-        connection.close()
-        
-        logger.info(f"✓ Saved {len(fraud_profiles)} fraud scores to staging.fraud_scores")
-        
-    except Exception as e:
-        logger.error(f"Failed to save fraud scores: {str(e)}")
-        raise
-
-def enrich_fraud_indicators(**context) -> Dict[str, Any]:
-    """
-    Main function called by Airflow DAG for fraud analysis
-    """
-    try:
-        # Read customer metrics from dbt model
-        postgres_hook = PostgresHook(postgres_conn_id='postgres_default')
-        
-        query = "SELECT * FROM analytics.stg_customer_metrics"
-        customer_profiles = postgres_hook.get_pandas_df(query).to_dict('records')
-        
-        if not customer_profiles:
-            raise ValueError("No customer profiles found in analytics.stg_customer_metrics")
-        
-        logger.info(f"Processing {len(customer_profiles)} customer profiles for fraud analysis")
-        
-        # Run fraud detection
-        fraud_engine = FraudDetectionEngine()
-        fraud_results = fraud_engine.enrich_fraud_indicators(customer_profiles, **context)
-        
-        # Save fraud scores to staging
-        _save_fraud_scores_to_staging(fraud_results['risk_analyzed_profiles'])
-        
-        # Log success
-        fraud_metrics = fraud_results.get('fraud_metrics', {})
-        high_risk_customers = fraud_metrics.get('high_risk_customers', 0)
-        logger.info(f"✓ Fraud analysis completed: {high_risk_customers} high-risk customers identified")
-        
-        return fraud_results
-        
-    except Exception as e:
-        logger.error(f"Error in fraud analysis: {str(e)}")
+# include/customer_risk_platform/fraud_analyzers.py
+"""
+Fraud detection engine with multi-dimensional risk scoring
+"""
+import bisect
+import csv
+import io
+import os
+import re
+import pandas as pd
+import numpy as np
+import logging
+from concurrent.futures import ProcessPoolExecutor
+from typing import Dict, Iterable, Iterator, List, Any, Tuple, Optional
+from datetime import datetime, timedelta
+import hashlib
+import json
+from enum import Enum
+from airflow.providers.postgres.hooks.postgres import PostgresHook
+from psycopg2.extras import RealDictCursor
+
+try:
+    import orjson
+
+    def _json_dumps(obj) -> str:
+        return orjson.dumps(obj).decode()
+except ImportError:
+    _json_dumps = json.dumps
+
+try:
+    import connectorx
+except ImportError:
+    connectorx = None
+
+logger = logging.getLogger(__name__)
+
+# Lowercased country sets, built once - frozenset membership replaces
+# the per-profile list scans in the geographic and ML feature paths
+_LOW_RISK_COUNTRIES = frozenset({'united states', 'canada', 'united kingdom'})
+_DOMESTIC_COUNTRIES = frozenset({'united states', 'canada'})
+
+# Alert lookup tables, hoisted so _create_fraud_alert does not rebuild
+# a dict (or walk an if/elif ladder) per alert
+_RECOMMENDED_ACTIONS = {
+    'critical': 'IMMEDIATE_INVESTIGATION_REQUIRED',
+    'high': 'PRIORITY_REVIEW',
+    'medium': 'ENHANCED_MONITORING',
+    'low': 'STANDARD_MONITORING'
+}
+_PRIORITY_THRESHOLDS = (0.6, 0.8, 0.9)
+_PRIORITY_LABELS = ('P4_LOW', 'P3_MEDIUM', 'P2_HIGH', 'P1_URGENT')
+
+# One compiled scan per email instead of two substring passes
+_DISPOSABLE_EMAIL_RE = re.compile(r'temp|disposable')
+
+# Risk level labels in ascending severity; codes index into np.bincount
+_LEVEL_CODES = {'low': 0, 'medium': 1, 'high': 2, 'critical': 3}
+
+# Below this batch size the pickling cost of process-pool sharding
+# outweighs the parallel speedup
+_PARALLEL_SHARD_THRESHOLD = 5000
+
+def _process_shard(profiles: List[Dict]) -> Tuple[List[Dict], List[Dict]]:
+    """
+    Score one profile shard - top-level so ProcessPoolExecutor can
+    pickle it. Engine state (weights, thresholds) is read-only, so each
+    worker builds its own engine with no coordination needed.
+    """
+    engine = FraudDetectionEngine()
+    return engine._analyze_profiles_batch(
+        engine._simulate_transaction_timestamps(profiles)
+    )
+
+def _splitmix64(ids: np.ndarray) -> np.ndarray:
+    """
+    Vectorized splitmix64 bit-mix over a uint64 customer_id array.
+    Replaces per-profile hash(str(customer_id)) - no string allocation,
+    no SipHash, and deterministic across processes (str hashing is
+    randomized per interpreter).
+    """
+    h = ids ^ (ids >> np.uint64(30))
+    h = h * np.uint64(0xbf58476d1ce4e5b9)
+    h ^= h >> np.uint64(27)
+    h = h * np.uint64(0x94d049bb133111eb)
+    h ^= h >> np.uint64(31)
+    return h
+
+class RiskLevel(Enum):
+    """Risk level classification"""
+    LOW = "low"
+    MEDIUM = "medium"
+    HIGH = "high"
+    CRITICAL = "critical"
+
+def _indicator(indicator_type: str, severity: str, confidence: float,
+               description: str, contributing_factors: List[str]) -> Dict[str, Any]:
+    """
+    Build an indicator payload dict directly. Indicators only ever get
+    serialized, so an intermediate dataclass would be wasted churn.
+    """
+    return {
+        'indicator_type': indicator_type,
+        'severity': severity,
+        'confidence': confidence,
+        'description': description,
+        'contributing_factors': contributing_factors
+    }
+
+class FraudDetectionEngine:
+    """Multi-dimensional fraud risk analyzer"""
+    
+    def __init__(self):
+        # Risk scoring weights
+        self.risk_weights = {
+            'velocity_risk': 0.25,
+            'geographic_risk': 0.20,
+            'behavioral_risk': 0.20,
+            'profile_risk': 0.15,
+            'amount_risk': 0.10,
+            'temporal_risk': 0.10
+        }
+        
+        # Canonical dimension order and matching weight vector - the
+        # batch composite is one (N,6) @ (6,) matrix-vector product
+        self._risk_keys = ('velocity_risk', 'geographic_risk', 'behavioral_risk',
+                           'profile_risk', 'amount_risk', 'temporal_risk')
+        self._weight_vec = np.array(
+            [self.risk_weights[k] for k in self._risk_keys], dtype=np.float64
+        )
+
+        # Column order of the batch ML feature matrix; must stay in sync
+        # with the stacking in _analyze_profiles_batch
+        self._ml_schema = (
+            'age', 'profile_completeness', 'total_spent', 'total_orders',
+            'avg_order_value', 'product_diversity_score', 'customer_activity_score',
+            'risk_velocity_risk', 'risk_geographic_risk', 'risk_behavioral_risk',
+            'risk_profile_risk', 'risk_amount_risk', 'risk_temporal_risk',
+            'max_daily_transactions', 'avg_daily_transactions',
+            'is_international', 'is_premium_customer', 'has_risk_indicators'
+        )
+
+        # Thresholds for risk classification
+        self.risk_thresholds = {
+            RiskLevel.LOW: 0.3,
+            RiskLevel.MEDIUM: 0.6,
+            RiskLevel.HIGH: 0.8,
+            RiskLevel.CRITICAL: 0.9
+        }
+        
+        # Industry fraud patterns
+        self.fraud_patterns = {
+            'high_velocity': {'threshold': 5, 'window_hours': 24},
+            'geographic_anomaly': {'distance_km': 1000, 'time_hours': 6},
+            'amount_spike': {'multiplier': 3.0, 'baseline_orders': 3},
+            'new_customer_high_activity': {'orders_threshold': 10, 'amount_threshold': 2000}
+        }
+
+    def enrich_fraud_indicators(self, customer_profiles: List[Dict], **context) -> Dict[str, Any]:
+        """
+        Main function to enrich customer profiles with fraud indicators
+        
+        Args:
+            customer_profiles: Transformed customer profiles from transformers module
+            
+        Returns:
+            Dict containing enriched profiles with fraud analysis
+        """
+        try:
+            logger.info(f"Starting fraud analysis for {len(customer_profiles)} customer profiles...")
+
+            # Score the batch columnar-style. Large batches are sharded
+            # across cores - profiles are independent, so the work is
+            # embarrassingly parallel.
+            workers = os.cpu_count() or 1
+            if len(customer_profiles) >= _PARALLEL_SHARD_THRESHOLD and workers > 1:
+                shard_size = -(-len(customer_profiles) // workers)
+                shards = [
+                    customer_profiles[i:i + shard_size]
+                    for i in range(0, len(customer_profiles), shard_size)
+                ]
+                risk_analyzed_profiles = []
+                fraud_alerts = []
+                with ProcessPoolExecutor(max_workers=workers) as executor:
+                    for shard_profiles, shard_alerts in executor.map(_process_shard, shards, chunksize=1):
+                        risk_analyzed_profiles.extend(shard_profiles)
+                        fraud_alerts.extend(shard_alerts)
+            else:
+                risk_analyzed_profiles, fraud_alerts = self._analyze_profiles_batch(
+                    self._simulate_transaction_timestamps(customer_profiles)
+                )
+
+            # Calculate metrics
+            analysis_metrics = self._calculate_fraud_metrics(risk_analyzed_profiles)
+            
+            logger.info(f"Fraud analysis completed. {len(fraud_alerts)} high-risk customers identified")
+            
+            return {
+                'risk_analyzed_profiles': risk_analyzed_profiles,
+                'fraud_alerts': fraud_alerts,
+                'fraud_metrics': analysis_metrics,
+                'analysis_timestamp': datetime.utcnow().isoformat()
+            }
+            
+        except Exception as e:
+            logger.error(f"Error in fraud analysis: {str(e)}")
+            raise
+
+
+    def _simulate_transaction_timestamps(self, profiles: List[Dict]) -> Iterator[Dict]:
+        """
+        Simulate realistic transaction timestamps for fraud analysis
+        Since DummyJSON doesn't provide timestamps, we create realistic patterns
+
+        Yields profiles one at a time so the pipeline never holds a
+        second fully-materialized intermediate list.
+        """
+        base_date = np.datetime64(datetime.utcnow() - timedelta(days=90), 'us')
+
+        for profile in profiles:
+            customer_id = profile['customer_id']
+            total_orders = profile.get('total_orders', 0)
+
+            # Generate realistic transaction timeline
+            if total_orders > 0:
+                # Whole-array draws from a per-customer Generator: one seed,
+                # one exponential call and one uniform call per customer
+                # instead of reseeding the legacy global RNG and drawing
+                # scalar-at-a-time in a Python loop
+                rng = np.random.default_rng(int(customer_id))
+
+                # Distribute transactions over time with some clustering for realism
+                days_offset = np.minimum(
+                    89,
+                    rng.exponential(scale=90 / total_orders, size=total_orders)
+                    * np.arange(total_orders)
+                )
+                hours_offset = rng.uniform(6, 22, size=total_orders)  # Business hours bias
+
+                offsets = ((days_offset * 86400 + hours_offset * 3600) * 1_000_000)
+                transaction_timestamps = base_date + offsets.astype('timedelta64[us]')
+                transaction_timestamps.sort()
+
+                # Only the endpoints are ever read downstream - keeping the
+                # full ISO string list was O(total_orders) pure waste
+                profile['first_transaction'] = str(transaction_timestamps[0])
+                profile['last_transaction'] = str(transaction_timestamps[-1])
+
+                # Calculate velocity metrics
+                profile['transaction_velocity'] = self._calculate_velocity_metrics(
+                    transaction_timestamps
+                )
+            else:
+                profile['transaction_velocity'] = {'max_daily': 0, 'avg_daily': 0}
+
+            yield profile
+
+    def _build_profile_columns(self, profiles: List[Dict]) -> Dict[str, np.ndarray]:
+        """
+        Normalize the profile dicts (AoS) into contiguous NumPy columns
+        (SoA) in one pass. Every downstream risk expression then reads
+        C-level arrays instead of repeating .get() cascades per profile.
+        """
+        def _numeric(key: str, default: float = 0.0) -> np.ndarray:
+            return np.array(
+                [p[key] if p.get(key) is not None else default for p in profiles],
+                dtype=np.float64
+            )
+
+        total_orders = _numeric('total_orders')
+
+        return {
+            'age': _numeric('age'),
+            'total_spent': _numeric('total_spent'),
+            'total_orders': total_orders,
+            'avg_order_value': _numeric('avg_order_value'),
+            'customer_activity_score': _numeric('customer_activity_score'),
+            'product_diversity_score': _numeric('product_diversity_score'),
+            'profile_completeness': _numeric('profile_completeness', 1.0),
+            'max_daily': np.array(
+                [(p.get('transaction_velocity') or {}).get('max_daily', 0) for p in profiles],
+                dtype=np.float64
+            ),
+            'avg_daily': np.array(
+                [(p.get('transaction_velocity') or {}).get('avg_daily', 0) for p in profiles],
+                dtype=np.float64
+            ),
+            'has_risk_indicators': np.array(
+                [bool(p.get('risk_indicators')) for p in profiles]
+            ),
+            # Transactions exist exactly when orders do - no need to keep
+            # (or consult) the simulated timestamp list
+            'has_transactions': total_orders > 0,
+            'country': np.array([(p.get('country') or '').lower() for p in profiles]),
+            'customer_segment': np.array([p.get('customer_segment') or 'new' for p in profiles]),
+            'suspicious_email': np.array([
+                bool(e and _DISPOSABLE_EMAIL_RE.search(e))
+                for e in (p.get('email', '') for p in profiles)
+            ]),
+            'customer_hash': _splitmix64(
+                np.array([p['customer_id'] for p in profiles], dtype=np.uint64)
+            )
+        }
+
+    def _analyze_profiles_batch(self, profiles: Iterable[Dict]) -> Tuple[List[Dict], List[Dict]]:
+        """
+        Vectorized fraud analysis across the whole profile batch.
+        All six risk dimensions are computed as NumPy column operations
+        instead of six Python method calls per profile; only indicator
+        assembly remains per-row (and only for flagged profiles).
+        """
+        # Column construction needs several passes, so the (lazy)
+        # simulation stream is pinned to a single pointer list here
+        profiles = list(profiles)
+        n = len(profiles)
+
+        cols = self._build_profile_columns(profiles)
+        total_spent = cols['total_spent']
+        total_orders = cols['total_orders']
+        avg_order_value = cols['avg_order_value']
+        diversity_score = cols['product_diversity_score']
+        completeness = cols['profile_completeness']
+        max_daily = cols['max_daily']
+        has_transactions = cols['has_transactions']
+        countries = cols['country']
+        segments = cols['customer_segment']
+        suspicious_email = cols['suspicious_email']
+        customer_hashes = cols['customer_hash']
+
+        # Simulated pattern buckets, same bucket sizes as the scalar path
+        # (5%, 4% and 6.7%) but drawn from independent slices of the mix
+        burst_pattern = (total_orders >= 10) & has_transactions & (customer_hashes % 20 == 0)
+        impossible_travel = (customer_hashes >> np.uint64(8)) % 25 == 0
+        off_hours = has_transactions & ((customer_hashes >> np.uint64(16)) % 15 == 0)
+
+        high_velocity = max_daily >= 5
+        international = ~np.isin(countries, list(_LOW_RISK_COUNTRIES))
+        new_high_spending = (segments == 'new') & (total_spent > 2000)
+        unusual_diversity = (diversity_score > 0.9) & (total_orders >= 5)
+        incomplete_profile = completeness < 0.5
+        high_avg_order = avg_order_value > 1000
+        round_number_bias = (total_spent > 0) & (total_spent % 100 == 0)
+
+        score_columns = {
+            'velocity_risk': np.minimum(1.0, 0.6 * high_velocity + 0.4 * burst_pattern),
+            'geographic_risk': np.minimum(1.0, 0.3 * international + 0.7 * impossible_travel),
+            'behavioral_risk': np.minimum(1.0, 0.5 * new_high_spending + 0.3 * unusual_diversity),
+            'profile_risk': np.minimum(1.0, 0.4 * incomplete_profile + 0.6 * suspicious_email),
+            'amount_risk': np.minimum(1.0, 0.4 * high_avg_order + 0.2 * round_number_bias),
+            'temporal_risk': np.minimum(1.0, 0.3 * off_hours)
+        }
+
+        # (N,6) @ (6,) - one BLAS matrix-vector product for all composites
+        score_matrix = np.stack([score_columns[k] for k in self._risk_keys], axis=1)
+        composite = np.minimum(1.0, score_matrix @ self._weight_vec)
+
+        # All ML features as one (N, 18) float32 matrix built straight
+        # from the SoA columns - rows only become dicts at assembly.
+        # Column order matches self._ml_schema.
+        ml_matrix = np.column_stack((
+            cols['age'], completeness, total_spent, total_orders,
+            avg_order_value, diversity_score, cols['customer_activity_score'],
+            score_matrix,
+            max_daily, cols['avg_daily'],
+            ~np.isin(countries, list(_DOMESTIC_COUNTRIES)),
+            segments == 'premium',
+            cols['has_risk_indicators']
+        )).astype(np.float32)
+
+        level_thresholds = (
+            self.risk_thresholds[RiskLevel.MEDIUM],
+            self.risk_thresholds[RiskLevel.HIGH],
+            self.risk_thresholds[RiskLevel.CRITICAL]
+        )
+        level_labels = ('low', 'medium', 'high', 'critical')
+        level_indices = np.searchsorted(level_thresholds, composite, side='right')
+        confidence = np.minimum(0.95, 0.5 + composite * 0.45)
+
+        risk_analyzed_profiles = []
+        fraud_alerts = []
+
+        # All alerts in one batch share a timestamp - one utcnow() call
+        # instead of two per alert
+        now = datetime.utcnow()
+        now_iso = now.isoformat()
+        now_ts = int(now.timestamp())
+
+        for i, profile in enumerate(profiles):
+            risk_scores = {k: float(v[i]) for k, v in score_columns.items()}
+            indicators = self._collect_batch_indicators(
+                profile,
+                high_velocity=high_velocity[i],
+                burst_pattern=burst_pattern[i],
+                international=international[i],
+                impossible_travel=impossible_travel[i],
+                new_high_spending=new_high_spending[i],
+                unusual_diversity=unusual_diversity[i],
+                incomplete_profile=incomplete_profile[i],
+                suspicious_email=suspicious_email[i],
+                high_avg_order=high_avg_order[i],
+                round_number_bias=round_number_bias[i],
+                off_hours=off_hours[i]
+            )
+
+            enriched_profile = {
+                **profile,
+                'composite_risk_score': float(composite[i]),
+                'risk_level': level_labels[level_indices[i]],
+                'individual_risk_scores': risk_scores,
+                'risk_classification_confidence': float(confidence[i]),
+                'fraud_indicators': indicators,
+                'ml_features': dict(zip(self._ml_schema, ml_matrix[i].tolist()))
+            }
+
+            risk_analyzed_profiles.append(enriched_profile)
+
+        # Alerts only exist for high/critical rows - gather those indices
+        # from the level array instead of string-comparing every profile
+        for i in np.flatnonzero(level_indices >= 2):
+            fraud_alerts.append(
+                self._create_fraud_alert(risk_analyzed_profiles[i], now_iso, now_ts)
+            )
+
+        return risk_analyzed_profiles, fraud_alerts
+
+    def _collect_batch_indicators(self, profile: Dict, *, high_velocity: bool,
+                                  burst_pattern: bool, international: bool,
+                                  impossible_travel: bool, new_high_spending: bool,
+                                  unusual_diversity: bool, incomplete_profile: bool,
+                                  suspicious_email: bool, high_avg_order: bool,
+                                  round_number_bias: bool, off_hours: bool) -> List[Dict]:
+        """Build indicator payload dicts from precomputed batch flags"""
+        indicators = []
+
+        if high_velocity:
+            max_daily = profile.get('transaction_velocity', {}).get('max_daily', 0)
+            indicators.append(_indicator(
+                indicator_type="HIGH_VELOCITY",
+                severity="high",
+                confidence=0.8,
+                description=f"Customer made {max_daily} transactions in single day",
+                contributing_factors=["unusual_transaction_frequency"]
+            ))
+        if burst_pattern:
+            indicators.append(_indicator(
+                indicator_type="BURST_PATTERN",
+                severity="medium",
+                confidence=0.7,
+                description="Detected burst of transactions in short timeframe",
+                contributing_factors=["transaction_clustering"]
+            ))
+        if international:
+            indicators.append(_indicator(
+                indicator_type="INTERNATIONAL_PROFILE",
+                severity="low",
+                confidence=0.6,
+                description=f"Customer located in {profile.get('country', '').lower()}",
+                contributing_factors=["geographic_location"]
+            ))
+        if impossible_travel:
+            indicators.append(_indicator(
+                indicator_type="IMPOSSIBLE_TRAVEL",
+                severity="high",
+                confidence=0.9,
+                description="Detected transactions from impossible geographic locations",
+                contributing_factors=["geographic_anomaly", "location_spoofing"]
+            ))
+        if new_high_spending:
+            indicators.append(_indicator(
+                indicator_type="NEW_CUSTOMER_HIGH_SPENDING",
+                severity="medium",
+                confidence=0.7,
+                description=f"New customer with high spending: ${profile.get('total_spent', 0)}",
+                contributing_factors=["unusual_behavior_pattern"]
+            ))
+        if unusual_diversity:
+            indicators.append(_indicator(
+                indicator_type="UNUSUAL_PRODUCT_DIVERSITY",
+                severity="low",
+                confidence=0.6,
+                description="Unusually diverse product purchase pattern",
+                contributing_factors=["behavioral_anomaly"]
+            ))
+        if incomplete_profile:
+            completeness = profile.get('profile_completeness', 1.0)
+            indicators.append(_indicator(
+                indicator_type="INCOMPLETE_PROFILE",
+                severity="medium",
+                confidence=0.8,
+                description=f"Profile only {completeness*100:.1f}% complete",
+                contributing_factors=["missing_information"]
+            ))
+        if suspicious_email:
+            indicators.append(_indicator(
+                indicator_type="SUSPICIOUS_EMAIL",
+                severity="high",
+                confidence=0.9,
+                description="Potentially disposable email address",
+                contributing_factors=["email_risk"]
+            ))
+        if high_avg_order:
+            indicators.append(_indicator(
+                indicator_type="HIGH_AVERAGE_ORDER",
+                severity="medium",
+                confidence=0.7,
+                description=f"High average order value: ${profile.get('avg_order_value', 0):.2f}",
+                contributing_factors=["amount_anomaly"]
+            ))
+        if round_number_bias:
+            indicators.append(_indicator(
+                indicator_type="ROUND_NUMBER_BIAS",
+                severity="low",
+                confidence=0.5,
+                description="Transaction amounts show round number pattern",
+                contributing_factors=["amount_pattern"]
+            ))
+        if off_hours:
+            indicators.append(_indicator(
+                indicator_type="OFF_HOURS_ACTIVITY",
+                severity="low",
+                confidence=0.6,
+                description="Unusual transaction timing patterns detected",
+                contributing_factors=["temporal_anomaly"]
+            ))
+
+        return indicators
+
+    def _calculate_velocity_metrics(self, timestamps: np.ndarray) -> Dict[str, float]:
+        """Calculate transaction velocity metrics from a datetime64 array"""
+        if timestamps.size == 0:
+            return {'max_daily': 0, 'avg_daily': 0}
+
+        # Truncating to day precision and counting in C replaces the
+        # per-timestamp date() allocation + dict increment loop
+        _, counts = np.unique(timestamps.astype('datetime64[D]'), return_counts=True)
+        return {
+            'max_daily': int(counts.max()),
+            'avg_daily': float(counts.mean())
+        }
+
+    def _create_fraud_alert(self, profile: Dict, now_iso: str = None,
+                            now_ts: int = None) -> Dict[str, Any]:
+        """Create fraud alert for high-risk customers"""
+        if now_iso is None:
+            now = datetime.utcnow()
+            now_iso = now.isoformat()
+            now_ts = int(now.timestamp())
+
+        return {
+            'alert_id': f"FRAUD_{profile['customer_id']}_{now_ts}",
+            'customer_id': profile['customer_id'],
+            'customer_name': profile.get('full_name', 'Unknown'),
+            'risk_level': profile['risk_level'],
+            'risk_score': profile['composite_risk_score'],
+            'primary_indicators': [indicator['indicator_type'] for indicator in profile['fraud_indicators'][:3]],
+            'alert_timestamp': now_iso,
+            'recommended_action': self._get_recommended_action(profile['risk_level']),
+            'investigation_priority': self._get_investigation_priority(profile['composite_risk_score'])
+        }
+
+    def _get_recommended_action(self, risk_level: str) -> str:
+        """Get recommended action based on risk level"""
+        return _RECOMMENDED_ACTIONS.get(risk_level, 'STANDARD_MONITORING')
+
+    def _get_investigation_priority(self, risk_score: float) -> str:
+        """Get investigation priority based on risk score"""
+        return _PRIORITY_LABELS[bisect.bisect_right(_PRIORITY_THRESHOLDS, risk_score)]
+
+    def _calculate_fraud_metrics(self, profiles: List[Dict]) -> Dict[str, Any]:
+        """Calculate overall fraud analysis metrics"""
+        total_customers = len(profiles)
+
+        # One pass over the profiles instead of a count pass per risk
+        # level plus a fifth for the average
+        level_counts = np.bincount(
+            np.fromiter(
+                (_LEVEL_CODES.get(p.get('risk_level'), 0) for p in profiles),
+                dtype=np.intp, count=total_customers
+            ),
+            minlength=len(_LEVEL_CODES)
+        )
+        scores = np.fromiter(
+            (p.get('composite_risk_score', 0) for p in profiles),
+            dtype=np.float64, count=total_customers
+        )
+
+        risk_distribution = {
+            level.value: {
+                'count': int(level_counts[_LEVEL_CODES[level.value]]),
+                'percentage': (int(level_counts[_LEVEL_CODES[level.value]]) / total_customers * 100) if total_customers > 0 else 0
+            }
+            for level in RiskLevel
+        }
+
+        avg_risk_score = float(scores.mean()) if total_customers > 0 else 0
+        
+        return {
+            'total_customers_analyzed': total_customers,
+            'risk_distribution': risk_distribution,
+            'average_risk_score': avg_risk_score,
+            'high_risk_customers': risk_distribution['high']['count'] + risk_distribution['critical']['count'],
+            'fraud_detection_rate': (risk_distribution['high']['count'] + risk_distribution['critical']['count']) / total_customers * 100 if total_customers > 0 else 0
+        }
+
+def _fetch_customer_profiles(postgres_hook: PostgresHook, query: str) -> List[Dict]:
+    """
+    Load customer profiles as a list of dicts without a pandas detour.
+
+    Prefers connectorx, which reads Postgres' binary protocol straight
+    into Arrow columns in Rust; otherwise falls back to a server-side
+    cursor streaming rows in chunks.
+    """
+    if connectorx is not None:
+        table = connectorx.read_sql(postgres_hook.get_uri(), query, return_type='arrow')
+        return table.to_pylist()
+
+    connection = postgres_hook.get_conn()
+    cursor = connection.cursor(
+        name='fraud_profile_stream',
+        cursor_factory=RealDictCursor
+    )
+    cursor.itersize = 5000
+    try:
+        cursor.execute(query)
+        return [dict(row) for row in cursor]
+    finally:
+        cursor.close()
+        connection.close()
+
+def _save_fraud_scores_to_staging(fraud_profiles: List[Dict]) -> None:
+    """Save fraud analysis results to staging for dbt consumption"""
+    if not fraud_profiles:
+        logger.warning("No fraud scores to save")
+        return
+    
+    from airflow.providers.postgres.hooks.postgres import PostgresHook
+    postgres_hook = PostgresHook(postgres_conn_id='postgres_default')
+    
+    try:
+        truncate_sql = "TRUNCATE TABLE staging.fraud_scores;"
+        postgres_hook.run(truncate_sql)
+
+        copy_sql = """
+        COPY staging.fraud_scores
+        (customer_id, composite_risk_score, risk_level,
+        velocity_risk, geographic_risk, behavioral_risk,
+        profile_risk, amount_risk, temporal_risk,
+        fraud_indicators_json, ml_features_json)
+        FROM STDIN WITH (FORMAT csv);
+        """
+
+        # COPY moves rows over one streamed protocol message instead of
+        # batched multi-row INSERTs - several times faster at high counts
+        buffer = io.StringIO()
+        writer = csv.writer(buffer)
+        for p in fraud_profiles:
+            scores = p['individual_risk_scores']
+            writer.writerow((
+                p['customer_id'],
+                p['composite_risk_score'],
+                p['risk_level'],
+                scores['velocity_risk'],
+                scores['geographic_risk'],
+                scores['behavioral_risk'],
+                scores['profile_risk'],
+                scores['amount_risk'],
+                scores['temporal_risk'],
+                _json_dumps(p['fraud_indicators']),
+                _json_dumps(p['ml_features'])
+            ))
+        buffer.seek(0)
+
+        connection = postgres_hook.get_conn()
+        cursor = connection.cursor()
+        cursor.copy_expert(copy_sql, buffer)
+
+        connection.commit()
+        cursor.close()
+        connection.close()
+
+        logger.info(f"✓ Saved {len(fraud_profiles)} fraud scores to staging.fraud_scores")
+        
+    except Exception as e:
+        logger.error(f"Failed to save fraud scores: {str(e)}")
+        raise
+
+def enrich_fraud_indicators(**context) -> Dict[str, Any]:
+    """
+    Main function called by Airflow DAG for fraud analysis
+    """
+    try:
+        # Read customer metrics from dbt model
+        postgres_hook = PostgresHook(postgres_conn_id='postgres_default')
+        query = "SELECT * FROM analytics.stg_customer_metrics"
+        customer_profiles = _fetch_customer_profiles(postgres_hook, query)
+
+        if not customer_profiles:
+            raise ValueError("No customer profiles found in analytics.stg_customer_metrics")
+        
+        logger.info(f"Processing {len(customer_profiles)} customer profiles for fraud analysis")
+        
+        # Run fraud detection
+        fraud_engine = FraudDetectionEngine()
+        fraud_results = fraud_engine.enrich_fraud_indicators(customer_profiles, **context)
+        
+        # Save fraud scores to staging
+        _save_fraud_scores_to_staging(fraud_results['risk_analyzed_profiles'])
+        
+        # Log success
+        fraud_metrics = fraud_results.get('fraud_metrics', {})
+        high_risk_customers = fraud_metrics.get('high_risk_customers', 0)
+        logger.info(f"✓ Fraud analysis completed: {high_risk_customers} high-risk customers identified")
+        
+        return fraud_results
+        
+    except Exception as e:
+        logger.error(f"Error in fraud analysis: {str(e)}")
         raise
\ No newline at end of file
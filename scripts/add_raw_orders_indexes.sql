@@ -0,0 +1,16 @@
+-- Indexes for date-bounded queries over staging.raw_orders (incident
+-- investigation, downstream models filtering by load day). The covering
+-- btree turns such aggregates into bounded index scans, and the BRIN
+-- index stays tiny for append-only ingestion patterns. The quality
+-- validation itself scans the whole table on purpose: staging is
+-- truncate-and-reloaded per run, so the full table is exactly the batch.
+--
+-- Run outside a transaction block (CONCURRENTLY requirement):
+--   psql "$POSTGRES_URI" -f scripts/add_raw_orders_indexes.sql
+
+CREATE INDEX CONCURRENTLY IF NOT EXISTS ix_raw_orders_created_at_price
+    ON staging.raw_orders (created_at)
+    INCLUDE (price, quantity, product_category);
+
+CREATE INDEX CONCURRENTLY IF NOT EXISTS ix_raw_orders_created_at_brin
+    ON staging.raw_orders USING BRIN (created_at);
@@ -1,37 +1,66 @@
-"""
-Setup Airflow connections for the data platform
-Run this script to configure database connections
-"""
-
-from airflow.models import Connection
-from airflow.utils.db import provide_session
-
-@provide_session
-def create_connections(session=None):
-    """Create database connections for the data platform"""
-    
-    # PostgreSQL connection
-    postgres_conn = Connection(
-        conn_id='postgres_default',
-        conn_type='postgres',
-        host='postgres',
-        schema='data_platform',
-        login='dataeng',
-        password='dataeng123',
-        port=5432
-    )
-    
-    # Check if connection exists
-    existing_conn = session.query(Connection).filter(
-        Connection.conn_id == 'postgres_default'
-    ).first()
-    
-    if not existing_conn:
-        session.add(postgres_conn)
-        session.commit()
-        print("PostgreSQL connection created successfully")
-    else:
-        print("PostgreSQL connection already exists")
-
-if __name__ == "__main__":
-    create_connections()
\ No newline at end of file
+"""
+Setup Airflow connections for the data platform
+Run this script to configure database connections
+"""
+
+from airflow.models import Connection
+from airflow.utils.db import provide_session
+from sqlalchemy import text
+from sqlalchemy.dialects.postgresql import insert as pg_insert
+
+@provide_session
+def create_connections(session=None):
+    """Create database connections for the data platform"""
+
+    # PostgreSQL connection - built through the model so the password
+    # goes through Airflow's fernet encryption before hitting the table
+    postgres_conn = Connection(
+        conn_id='postgres_default',
+        conn_type='postgres',
+        host='postgres',
+        schema='data_platform',
+        login='dataeng',
+        password='dataeng123',
+        port=5432
+    )
+
+    # The ON CONFLICT insert below relies on a unique index over
+    # conn_id. Airflow's migrations provide one (unique_conn_id), but
+    # stripped-down metastores may lack it - check the catalog and add
+    # an O(log n) unique index only when missing.
+    has_unique_conn_id = session.execute(text("""
+        SELECT 1
+        FROM pg_index ix
+        JOIN pg_class t ON t.oid = ix.indrelid
+        JOIN pg_attribute a ON a.attrelid = t.oid AND a.attnum = ANY(ix.indkey)
+        WHERE t.relname = 'connection' AND ix.indisunique AND a.attname = 'conn_id'
+    """)).first()
+    if not has_unique_conn_id:
+        session.execute(text(
+            "CREATE UNIQUE INDEX ix_connection_conn_id ON connection (conn_id)"
+        ))
+
+    # Single race-free round trip: the unique index on conn_id decides
+    # instead of a query-then-insert pair
+    stmt = pg_insert(Connection.__table__).values([{
+        'conn_id': postgres_conn.conn_id,
+        'conn_type': postgres_conn.conn_type,
+        'host': postgres_conn.host,
+        'schema': postgres_conn.schema,
+        'login': postgres_conn.login,
+        'password': postgres_conn._password,
+        'port': postgres_conn.port,
+        'is_encrypted': postgres_conn.is_encrypted,
+        'is_extra_encrypted': postgres_conn.is_extra_encrypted,
+    }]).on_conflict_do_nothing(index_elements=['conn_id'])
+
+    result = session.execute(stmt)
+    session.commit()
+
+    if result.rowcount:
+        print("PostgreSQL connection created successfully")
+    else:
+        print("PostgreSQL connection already exists")
+
+if __name__ == "__main__":
+    create_connections()